@@ -5,12 +5,264 @@ AI Refiner for Architecture Diagrams
 Analyzes relationships and improves diagram quality
 Inspired by TerraVision: https://github.com/patrickchugh/terravision
 """
+import hashlib
 import json
+import mmap
+import os
 import re
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Optional, Set, Tuple
 from collections import defaultdict
 
+# Shared with the analyzer so both scripts skip the same directories and
+# classify detection patterns the same way
+from analyze_repo import SKIP_DIRS, is_skipped_dir, on_same_line, split_patterns
+
+# Below this many files a process pool costs more than it saves
+PARALLEL_MIN_FILES = 64
+
+# Per-file scan results are cached across runs, one file per repository:
+# inside .git/ when there is one, otherwise under the user cache directory.
+# The version (SCAN_CACHE_VERSION, below the patterns) is derived from the
+# patterns themselves, so editing them discards stale results
+SCAN_CACHE_NAME = "auto-arch-scan-cache.json"
+SCAN_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "auto-arch-diagrams"
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Service-to-service relationships
+SERVICE_PATTERNS = [
+    r"from (?:src\.)?(?:app\.)?(?:api\.)?services\.(\w+(?:_service)?) import",
+    r"from (?:src\.)?(?:app\.)?(?:api\.)?(?:\w+\.)*(\w+_service) import",
+    r"(\w+Service)\(",
+    r"(\w+_service)\.",
+]
+
+# Controller/resolver-to-service relationships
+CONSUMER_PATTERNS = [
+    r"from (?:src\.)?(?:app\.)?(?:api\.)?services\.(\w+(?:_service)?) import",
+    r"(\w+Service)\(",
+    r"(\w+_service)\.",
+]
+
+# Database relationships
+DB_PATTERNS = {
+    "MongoDB": [r"MongoClient", r"mongo", r"mongodb", r"MongoDBService"],
+    "PostgreSQL": [r"psycopg2", r"asyncpg", r"sqlalchemy", r"Session", r"\.query\("],
+    "MySQL": [r"mysql", r"pymysql", r"MySQLdb"],
+    "Redis": [r"redis", r"Redis", r"redis_client"],
+    "DynamoDB": [r"dynamodb", r"DynamoDB", r"boto3.*dynamodb"],
+}
+
+# Storage relationships
+STORAGE_PATTERNS = {
+    "S3": [r"boto3.*s3", r"s3_client", r"\.s3\.", r"S3"],
+    "Google Cloud Storage": [r"google.*storage", r"gcs"],
+    "Azure Blob": [r"azure.*blob", r"BlobService"],
+}
+
+# Message queue relationships
+QUEUE_PATTERNS = {
+    "SQS": [r"sqs", r"SQS", r"boto3.*sqs"],
+    "SNS": [r"sns", r"SNS", r"boto3.*sns"],
+    "RabbitMQ": [r"rabbitmq", r"pika", r"celery"],
+    "Kafka": [r"kafka", r"confluent"],
+    "Pub/Sub": [r"pubsub", r"google.*pubsub"],
+}
+
+# Directories whose files are treated as controllers
+CONTROLLER_DIRS = {"controllers", "routes", "views", "handlers"}
+
+# Service name keyword -> suggested group, in precedence order
+SERVICE_GROUP_KEYWORDS = {
+    **dict.fromkeys(["auth", "user", "login", "token", "jwt"], "Authentication"),
+    **dict.fromkeys(["notification", "email", "sms", "message"], "Notification"),
+    **dict.fromkeys(["file", "upload", "download", "storage", "document"], "File Processing"),
+    **dict.fromkeys(["analytics", "report", "metric", "stat"], "Analytics"),
+    **dict.fromkeys(["process", "transform", "etl", "data"], "Data Processing"),
+}
+
+DETECTION_CATEGORIES = [
+    ("service_to_database", DB_PATTERNS),
+    ("service_to_storage", STORAGE_PATTERNS),
+    ("service_to_queue", QUEUE_PATTERNS),
+]
+
+SCAN_CACHE_VERSION = hashlib.sha1(repr((
+    SERVICE_PATTERNS, CONSUMER_PATTERNS, DETECTION_CATEGORIES, sorted(SKIP_DIRS),
+)).encode()).hexdigest()
+
+
+def _compile_alternation(patterns: List[str]) -> re.Pattern:
+    """Compiles a list of ASCII patterns into a single case-insensitive bytes alternation"""
+    return re.compile("|".join(f"(?:{p})" for p in patterns).encode("ascii"), re.IGNORECASE)
+
+
+def _build_detectors() -> Tuple[object, List[Tuple[str, str, Tuple[bytes, ...], Tuple[Tuple[bytes, bytes], ...], Optional[re.Pattern]]]]:
+    """Builds the literal automaton (if available) and the per-name detectors.
+    
+    Each detector is (relation, name, literals, bridged, regex), classified
+    by the analyzer's split_patterns. Literals are checked with plain
+    substring search, or folded into a single Aho-Corasick automaton when
+    pyahocorasick is installed; bridged pairs with on_same_line.
+    """
+    automaton = ahocorasick.Automaton() if ahocorasick is not None else None
+    detectors = []
+    for relation, category_patterns in DETECTION_CATEGORIES:
+        for name, patterns in category_patterns.items():
+            literals, bridged, regexes = split_patterns(patterns)
+            literals = sorted(literals, key=len)
+            if automaton is not None:
+                for literal in literals:
+                    needle = literal.decode("ascii")
+                    targets = automaton.get(needle, set())
+                    targets.add((relation, name))
+                    automaton.add_word(needle, targets)
+                literals = ()
+            # Lowercasing a regex source would flip escapes such as \S or \W,
+            # so true regexes keep IGNORECASE even on lowercased lines
+            regex = _compile_alternation(regexes) if regexes else None
+            if literals or bridged or regex is not None:
+                detectors.append((relation, name, tuple(literals), tuple(bridged), regex))
+    if automaton is not None:
+        automaton.make_automaton()
+    return automaton, detectors
+
+
+# Service patterns overlap (an import of a.b_service.c_service matches
+# several of them), so each one is matched separately rather than as one
+# alternation, which would report only the first of overlapping matches
+_SERVICE_IMPORT_RES = [re.compile(p.encode("ascii"), re.IGNORECASE) for p in SERVICE_PATTERNS]
+_CONSUMER_IMPORT_RES = [re.compile(p.encode("ascii"), re.IGNORECASE) for p in CONSUMER_PATTERNS]
+_SERVICE_SUFFIX_RE = re.compile(r"(?:_service|Service)$")
+_LITERAL_AUTOMATON, _DETECTORS = _build_detectors()
+_DETECTION_TOTAL = sum(len(category_patterns) for _, category_patterns in DETECTION_CATEGORIES)
+
+
+def _scan_service_file(file_path: Path, service_name: str) -> Dict[str, Set[str]]:
+    """Scans a service file for dependencies on other services and infrastructure"""
+    found = defaultdict(set)
+    detected = set()
+    
+    # All patterns are ASCII and intra-line, so the file is matched line by
+    # line as raw bytes straight from the mapping; only captured names are
+    # ever decoded
+    for line in _mapped_lines(file_path):
+        # Service-to-service relationships
+        for pattern in _SERVICE_IMPORT_RES:
+            for match in pattern.finditer(line):
+                imported_service = _SERVICE_SUFFIX_RE.sub("", match.group(1).decode("utf-8", "replace"))
+                if imported_service.lower() != service_name.lower():
+                    found["service_to_service"].add(imported_service)
+        
+        # Database, storage and message queue relationships
+        if len(detected) == _DETECTION_TOTAL:
+            continue
+        
+        # Detection patterns are ASCII, so lowercasing once is cheaper
+        # than case-folding inside the regex engine
+        line_lower = line.lower()
+        if _LITERAL_AUTOMATON is not None:
+            for _, targets in _LITERAL_AUTOMATON.iter(line_lower.decode("latin-1")):
+                detected.update(targets)
+        
+        for relation, name, literals, bridged, regex in _DETECTORS:
+            if (relation, name) in detected:
+                continue
+            if (any(literal in line_lower for literal in literals)
+                    or any(on_same_line(line_lower, first, second) for first, second in bridged)
+                    or (regex is not None and regex.search(line_lower))):
+                detected.add((relation, name))
+    
+    for relation, name in detected:
+        found[relation].add(name)
+    
+    return dict(found)
+
+
+def _scan_consumer_file(file_path: Path, relation: str) -> Dict[str, Set[str]]:
+    """Scans a controller or resolver file for the services it uses"""
+    services = set()
+    for line in _mapped_lines(file_path):
+        for pattern in _CONSUMER_IMPORT_RES:
+            for match in pattern.finditer(line):
+                services.add(_SERVICE_SUFFIX_RE.sub("", match.group(1).decode("utf-8", "replace")))
+    
+    return {relation: services} if services else {}
+
+
+def _mapped_lines(file_path: Path):
+    """Yields the raw lines of a file through a read-only memory map"""
+    with open(file_path, "rb") as f:
+        # Empty files cannot be mapped
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield from iter(mm.readline, b"")
+
+
+def _scan_file(file_path: Path, kind: str, name: str) -> Optional[Dict[str, Set[str]]]:
+    """Scans a single file and returns its relationships (runs in worker processes)"""
+    try:
+        if kind == "service":
+            return _scan_service_file(file_path, name)
+        return _scan_consumer_file(file_path, f"{kind}_to_service")
+    except Exception as e:
+        print(f"⚠️ Error analyzing {file_path}: {e}")
+        return None
+
+
+def _classify_file(stem: str, parents: Tuple[str, ...]) -> List[Tuple[str, str]]:
+    """Returns the (kind, component name) roles of a file from its name and location.
+    
+    A file can play several roles, e.g. services/user_controller.py is
+    analyzed both as a service and as a controller.
+    """
+    parent = parents[-1] if parents else ""
+    roles = []
+    
+    # Services
+    if "service" in stem or parent == "services":
+        roles.append(("service", _SERVICE_SUFFIX_RE.sub("", stem)))
+    
+    # Controllers
+    if parent in CONTROLLER_DIRS:
+        roles.append(("controller", stem.replace("_controller", "").replace("Controller", "")))
+    
+    # GraphQL resolvers
+    if parent == "resolvers" or "graphql" in parents:
+        roles.append(("resolver", stem.replace("_resolver", "").replace("Resolver", "")))
+    
+    return roles
+
+
+def _walk_python_files(root: Path):
+    """Yields (entry, parent directory names) for every .py file under root in a single traversal"""
+    stack = [(str(root), ())]
+    while stack:
+        directory, parents = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_skipped_dir(entry.name):
+                            stack.append((entry.path, parents + (entry.name,)))
+                    elif entry.name.endswith(".py"):
+                        yield entry, parents
+        except OSError:
+            continue
+
 class AIRefiner:
     """
     Refines diagrams using intelligent analysis:
@@ -60,7 +312,10 @@ class AIRefiner:
         
         self.components = self.analysis.get("components", {})
         self.relationships = {}
+        self.relation_counts = {}
         self.suggestions = []
+        self._scan_cache_file = self._scan_cache_path()
+        self._scan_cache = self._load_scan_cache()
     
     def analyze_relationships(self) -> Dict:
         """Analyzes relationships between services, controllers and models"""
@@ -75,151 +330,138 @@ class AIRefiner:
             "service_to_queue": defaultdict(set),
         }
         
-        # Analyze each source directory
-        for source_path in self.source_paths:
-            if not source_path.exists():
-                continue
-                
-            print(f"   Analyzing: {source_path}")
-            
-            # Analyze services
-            service_files = list(source_path.rglob("*service*.py")) + list(source_path.rglob("**/services/*.py"))
-            for service_file in service_files:
-                if service_file.stem != "__init__":
-                    service_name = service_file.stem.replace("_service", "").replace("Service", "")
-                    self._analyze_service_file(service_file, service_name, relationships)
-            
-            # Analyze controllers
-            controller_patterns = ["**/controllers/*.py", "**/routes/*.py", "**/views/*.py", "**/handlers/*.py"]
-            for pattern in controller_patterns:
-                for controller_file in source_path.glob(pattern):
-                    if controller_file.stem != "__init__":
-                        controller_name = controller_file.stem.replace("_controller", "").replace("Controller", "")
-                        self._analyze_controller_file(controller_file, controller_name, relationships)
+        # Files are classified as the tree is walked; unchanged ones are served
+        # from the scan cache straight away and only the rest are queued.
+        # Only entries for files seen in this run are kept, so deleted files
+        # drop out of the cache
+        results = []
+        pending = []
+        scan_cache = {}
+        for file_path, kind, name, stat in self._iter_source_files():
+            cache_key = f"{kind}:{name}:{file_path}"
+            cached = self._scan_cache.get(cache_key)
+            if (stat is not None and cached is not None
+                    and cached["mtime_ns"] == stat.st_mtime_ns and cached["size"] == stat.st_size):
+                scan_cache[cache_key] = cached
+                results.append((name, cached["relations"]))
+            else:
+                pending.append((len(results), file_path, kind, name, stat))
+                results.append((name, None))
+        
+        if pending:
+            _, paths, kinds, names, _ = zip(*pending)
+            if len(pending) >= PARALLEL_MIN_FILES:
+                with ProcessPoolExecutor() as executor:
+                    scanned = list(executor.map(_scan_file, paths, kinds, names, chunksize=32))
+            else:
+                scanned = map(_scan_file, paths, kinds, names)
             
-            # Analyze GraphQL resolvers
-            resolver_patterns = ["**/resolvers/*.py", "**/graphql/**/*.py"]
-            for pattern in resolver_patterns:
-                for resolver_file in source_path.glob(pattern):
-                    if resolver_file.stem != "__init__":
-                        resolver_name = resolver_file.stem.replace("_resolver", "").replace("Resolver", "")
-                        self._analyze_resolver_file(resolver_file, resolver_name, relationships)
+            for (index, file_path, kind, name, stat), found in zip(pending, scanned):
+                results[index] = (name, found)
+                if found is not None and stat is not None:
+                    scan_cache[f"{kind}:{name}:{file_path}"] = {
+                        "mtime_ns": stat.st_mtime_ns,
+                        "size": stat.st_size,
+                        "relations": {relation: sorted(targets) for relation, targets in found.items()},
+                    }
+        
+        if pending or scan_cache.keys() != self._scan_cache.keys():
+            self._scan_cache = scan_cache
+            self._save_scan_cache()
+        
+        # The same service names recur across many files; interning lets all
+        # of those references share one string object
+        for name, found in results:
+            for relation, targets in (found or {}).items():
+                relationships[relation][sys.intern(name)].update(map(sys.intern, targets))
+        
+        # Count once so every report reads the same totals
+        self.relation_counts = {
+            relation: sum(len(deps) for deps in dependencies.values())
+            for relation, dependencies in relationships.items()
+        }
         
         # Show summary
-        total_service_relations = sum(len(deps) for deps in relationships["service_to_service"].values())
-        total_controller_relations = sum(len(deps) for deps in relationships["controller_to_service"].values())
-        print(f"   ✅ Found {total_service_relations} service-service, {total_controller_relations} controller-service relationships")
+        print(f"   ✅ Found {self.relation_counts['service_to_service']} service-service, "
+              f"{self.relation_counts['controller_to_service']} controller-service relationships")
         
         self.relationships = relationships
         return relationships
     
-    def _analyze_service_file(self, file_path: Path, service_name: str, relationships: Dict):
-        """Analyzes a service file to detect dependencies"""
-        try:
-            content = file_path.read_text(encoding='utf-8')
-            
-            # Service-to-service relationships
-            service_patterns = [
-                r"from (?:src\.)?(?:app\.)?(?:api\.)?services\.(\w+(?:_service)?) import",
-                r"from (?:src\.)?(?:app\.)?(?:api\.)?(?:\w+\.)*(\w+_service) import",
-                r"(\w+Service)\(",
-                r"(\w+_service)\.",
-            ]
-            
-            for pattern in service_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    imported_service = match.group(1).replace("_service", "").replace("Service", "")
-                    if imported_service.lower() != service_name.lower():
-                        relationships["service_to_service"][service_name].add(imported_service)
-            
-            # Database relationships
-            db_patterns = {
-                "MongoDB": [r"MongoClient", r"mongo", r"mongodb", r"MongoDBService"],
-                "PostgreSQL": [r"psycopg2", r"asyncpg", r"sqlalchemy", r"Session", r"\.query\("],
-                "MySQL": [r"mysql", r"pymysql", r"MySQLdb"],
-                "Redis": [r"redis", r"Redis", r"redis_client"],
-                "DynamoDB": [r"dynamodb", r"DynamoDB", r"boto3.*dynamodb"],
-            }
-            
-            for db_name, patterns in db_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        relationships["service_to_database"][service_name].add(db_name)
-                        break
-            
-            # Storage relationships
-            storage_patterns = {
-                "S3": [r"boto3.*s3", r"s3_client", r"\.s3\.", r"S3"],
-                "Google Cloud Storage": [r"google.*storage", r"gcs"],
-                "Azure Blob": [r"azure.*blob", r"BlobService"],
-            }
-            
-            for storage_name, patterns in storage_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        relationships["service_to_storage"][service_name].add(storage_name)
-                        break
-            
-            # Message queue relationships
-            queue_patterns = {
-                "SQS": [r"sqs", r"SQS", r"boto3.*sqs"],
-                "SNS": [r"sns", r"SNS", r"boto3.*sns"],
-                "RabbitMQ": [r"rabbitmq", r"pika", r"celery"],
-                "Kafka": [r"kafka", r"confluent"],
-                "Pub/Sub": [r"pubsub", r"google.*pubsub"],
-            }
-            
-            for queue_name, patterns in queue_patterns.items():
-                for pattern in patterns:
-                    if re.search(pattern, content, re.IGNORECASE):
-                        relationships["service_to_queue"][service_name].add(queue_name)
-                        break
+    def _iter_source_files(self):
+        """Yields (file_path, kind, name, stat) for each file to analyze, walking every source root once"""
+        seen = set()
+        for source_path in self.source_paths:
+            if not source_path.exists():
+                continue
+                
+            print(f"   Analyzing: {source_path}")
             
-        except Exception as e:
-            print(f"⚠️ Error analyzing {file_path}: {e}")
+            # Walk the tree once and classify each file by name and location
+            for entry, parents in _walk_python_files(source_path):
+                stem = entry.name[:-len(".py")]
+                if stem == "__init__":
+                    continue
+                
+                roles = _classify_file(stem, parents)
+                if not roles:
+                    continue
+                
+                # Overlapping source roots or symlinks can reach the same file twice
+                real_path = os.path.realpath(entry.path)
+                if real_path in seen:
+                    continue
+                seen.add(real_path)
+                
+                file_path = Path(entry.path)
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    stat = None
+                
+                for kind, name in roles:
+                    yield file_path, kind, name, stat
     
-    def _analyze_controller_file(self, file_path: Path, controller_name: str, relationships: Dict):
-        """Analyzes a controller file to detect services used"""
+    def _scan_cache_path(self) -> Path:
+        """Returns this repository's scan cache file"""
+        git_dir = self.repo_root / ".git"
+        if git_dir.is_dir():
+            return git_dir / SCAN_CACHE_NAME
+        repo_id = hashlib.sha1(str(self.repo_root.resolve()).encode("utf-8")).hexdigest()
+        return SCAN_CACHE_DIR / f"{repo_id}.json"
+    
+    def _load_scan_cache(self) -> Dict:
+        """Loads per-file scan results from previous runs"""
         try:
-            content = file_path.read_text(encoding='utf-8')
-            
-            # Controller-to-service relationships
-            service_patterns = [
-                r"from (?:src\.)?(?:app\.)?(?:api\.)?services\.(\w+(?:_service)?) import",
-                r"(\w+Service)\(",
-                r"(\w+_service)\.",
-            ]
-            
-            for pattern in service_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    imported_service = match.group(1).replace("_service", "").replace("Service", "")
-                    relationships["controller_to_service"][controller_name].add(imported_service)
-            
-        except Exception as e:
-            print(f"⚠️ Error analyzing {file_path}: {e}")
+            with open(self._scan_cache_file, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") == SCAN_CACHE_VERSION:
+                return cache.get("files", {})
+        except (OSError, ValueError):
+            pass
+        return {}
     
-    def _analyze_resolver_file(self, file_path: Path, resolver_name: str, relationships: Dict):
-        """Analyzes a GraphQL resolver file"""
+    def _save_scan_cache(self):
+        """Persists per-file scan results for the next run"""
+        tmp_file = None
         try:
-            content = file_path.read_text(encoding='utf-8')
-            
-            # Resolver-to-service relationships
-            service_patterns = [
-                r"from (?:src\.)?(?:app\.)?(?:api\.)?services\.(\w+(?:_service)?) import",
-                r"(\w+Service)\(",
-                r"(\w+_service)\.",
-            ]
-            
-            for pattern in service_patterns:
-                matches = re.finditer(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    imported_service = match.group(1).replace("_service", "").replace("Service", "")
-                    relationships["resolver_to_service"][resolver_name].add(imported_service)
-            
-        except Exception as e:
-            print(f"⚠️ Error analyzing {file_path}: {e}")
+            self._scan_cache_file.parent.mkdir(parents=True, exist_ok=True)
+            # A unique temporary name keeps concurrent runs from clobbering
+            # each other's half-written file; the last replace wins
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=self._scan_cache_file.parent,
+                prefix=self._scan_cache_file.name, suffix=".tmp", delete=False,
+            ) as f:
+                tmp_file = f.name
+                json.dump({"version": SCAN_CACHE_VERSION, "files": self._scan_cache}, f)
+            os.replace(tmp_file, self._scan_cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not save scan cache: {e}")
+            if tmp_file is not None:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
     
     def generate_suggestions(self) -> List[Dict]:
         """Generates suggestions to improve the diagram"""
@@ -268,24 +510,12 @@ class AIRefiner:
         
         for service in services:
             service_lower = service.lower()
-            
-            # Authentication services
-            if any(keyword in service_lower for keyword in ["auth", "user", "login", "token", "jwt"]):
-                groups["Authentication"].append(service)
-            # Notification services
-            elif any(keyword in service_lower for keyword in ["notification", "email", "sms", "message"]):
-                groups["Notification"].append(service)
-            # File processing
-            elif any(keyword in service_lower for keyword in ["file", "upload", "download", "storage", "document"]):
-                groups["File Processing"].append(service)
-            # Analytics
-            elif any(keyword in service_lower for keyword in ["analytics", "report", "metric", "stat"]):
-                groups["Analytics"].append(service)
-            # Data processing
-            elif any(keyword in service_lower for keyword in ["process", "transform", "etl", "data"]):
-                groups["Data Processing"].append(service)
-            # Core services (fallback)
+            for keyword, group in SERVICE_GROUP_KEYWORDS.items():
+                if keyword in service_lower:
+                    groups[group].append(service)
+                    break
             else:
+                # Core services (fallback)
                 groups["Core Services"].append(service)
         
         # Filter empty groups
@@ -336,34 +566,38 @@ class AIRefiner:
     def _apply_connection_suggestions(self, code: str) -> str:
         """Applies connection suggestions between components"""
         # Count total relationships for reporting
-        total_relations = sum(len(deps) for deps in self.relationships.get("service_to_service", {}).values())
+        total_relations = self.relation_counts.get("service_to_service", 0)
         
         if total_relations > 0:
             # Add informative comment about detected relationships
             comment = f"\n    # AI Detected {total_relations} service-to-service relationships\n"
             comment += "    # (Services shown as group; individual connections not displayed)\n"
             
-            # Insert after FLOWS section
-            flows_pos = code.find("# FLOWS")
-            if flows_pos != -1:
-                # Find end of flows section
-                flows_end = code.find("\n    # Background", flows_pos)
-                if flows_end == -1:
-                    flows_end = len(code)
-                code = code[:flows_end] + comment + code[flows_end:]
+            # Insert at the end of the FLOWS section, which is followed by the
+            # background job flows when there are any
+            if "# FLOWS" in code:
+                marker = "\n    # Background"
+                if marker in code:
+                    code = code.replace(marker, comment + marker, 1)
+                else:
+                    code += comment
         
         return code
     
     def _apply_label_suggestions(self, code: str) -> str:
         """Applies label improvements"""
-        for suggestion in self.suggestions:
-            if suggestion["type"] == "label" and suggestion["component"] == "diagram_title":
-                code = code.replace(
-                    suggestion["current"],
-                    suggestion["suggested"]
-                )
+        labels = {
+            suggestion["current"]: suggestion["suggested"]
+            for suggestion in self.suggestions
+            if suggestion["type"] == "label" and suggestion["component"] == "diagram_title"
+        }
+        if not labels:
+            return code
         
-        return code
+        # Replace every label in a single pass; longer labels first so they
+        # win over any label they contain
+        labels_re = re.compile("|".join(re.escape(label) for label in sorted(labels, key=len, reverse=True)))
+        return labels_re.sub(lambda match: labels[match.group(0)], code)
     
     def save_refinement_report(self, output_file: str = None):
         """Saves refinement report"""
@@ -372,12 +606,18 @@ class AIRefiner:
         else:
             output_file = Path(output_file)
         
-        report = {
-            "relationships": {
+        if orjson is not None:
+            # orjson converts the sets itself through `default`
+            relationships = self.relationships
+        else:
+            relationships = {
                 k: {key: list(val) if isinstance(val, set) else val 
                     for key, val in v.items()} 
                 for k, v in self.relationships.items()
-            },
+            }
+        
+        report = {
+            "relationships": relationships,
             "suggestions": self.suggestions,
             "summary": {
                 "total_relationships": sum(len(v) for v in self.relationships.values() if isinstance(v, dict)),
@@ -386,8 +626,13 @@ class AIRefiner:
             }
         }
         
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(report, f, indent=2, ensure_ascii=False)
+        if orjson is not None:
+            output_file.write_bytes(
+                orjson.dumps(report, default=list, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+            )
+        else:
+            with open(output_file, "w", encoding="utf-8") as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
         
         print(f"📊 Refinement report saved to: {output_file}")
 
@@ -409,10 +654,8 @@ if __name__ == "__main__":
         print(f"\n✅ AI relationship analysis completed:")
         print(f"  Services with dependencies: {len(relationships.get('service_to_service', {}))}")
         print(f"  Controllers with services: {len(relationships.get('controller_to_service', {}))}")
-        total_db_relations = sum(len(deps) for deps in relationships.get('service_to_database', {}).values())
-        print(f"  Database connections: {total_db_relations}")
-        total_storage_relations = sum(len(deps) for deps in relationships.get('service_to_storage', {}).values())
-        print(f"  Storage connections: {total_storage_relations}")
+        print(f"  Database connections: {refiner.relation_counts.get('service_to_database', 0)}")
+        print(f"  Storage connections: {refiner.relation_counts.get('service_to_storage', 0)}")
         print(f"  Generated suggestions: {len(suggestions)}")
         
     except FileNotFoundError as e:
@@ -7,9 +7,436 @@ Analyzes any repository structure and detects architectural components
 import os
 import re
 import json
+import hashlib
+import tempfile
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, List, Set
-from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+from collections import defaultdict, deque
+
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+try:
+    import tomllib
+except ImportError:
+    tomllib = None
+
+# numpy and numba are only imported when pyahocorasick is missing (below)
+np = njit = None
+
+# Technology detection patterns, keyed by the component they populate
+DB_PATTERNS = {
+    "PostgreSQL": [
+        r"psycopg2", r"asyncpg", r"postgresql://", 
+        r"postgres://", r"PostgreSQL", r"POSTGRES"
+    ],
+    "MySQL": [
+        r"mysql", r"pymysql", r"mysql://", r"MySQL", r"MYSQL"
+    ],
+    "MongoDB": [
+        r"pymongo", r"MongoClient", r"mongodb://", 
+        r"MongoDB", r"mongo"
+    ],
+    "SQLite": [
+        r"sqlite3", r"sqlite://", r"\.db$", r"\.sqlite$"
+    ],
+    "Redis": [
+        r"redis", r"Redis", r"redis://", r"REDIS"
+    ],
+    "DynamoDB": [
+        r"dynamodb", r"DynamoDB", r"boto3.*dynamodb"
+    ],
+}
+
+AWS_PATTERNS = {
+    "S3": [r"boto3.*s3", r"s3_client", r"S3", r"\.s3\.", r"aws.*s3"],
+    "Lambda": [r"lambda", r"Lambda", r"aws.*lambda"],
+    "SNS": [r"sns", r"SNS", r"aws.*sns"],
+    "SQS": [r"sqs", r"SQS", r"aws.*sqs"],
+    "RDS": [r"rds", r"RDS", r"aws.*rds"],
+    "DynamoDB": [r"dynamodb", r"DynamoDB", r"aws.*dynamodb"],
+    "CloudWatch": [r"cloudwatch", r"CloudWatch"],
+    "API Gateway": [r"apigateway", r"API.*Gateway"],
+}
+
+GCP_PATTERNS = {
+    "Cloud Storage": [r"google.*storage", r"gcs", r"Cloud.*Storage"],
+    "BigQuery": [r"bigquery", r"BigQuery"],
+    "Pub/Sub": [r"pubsub", r"Pub.*Sub"],
+    "Cloud Functions": [r"cloud.*functions", r"gcp.*functions"],
+}
+
+AZURE_PATTERNS = {
+    "Blob Storage": [r"azure.*blob", r"BlobService"],
+    "Service Bus": [r"azure.*servicebus", r"ServiceBus"],
+    "Functions": [r"azure.*functions", r"AzureFunctions"],
+}
+
+PATTERN_CATEGORIES = {
+    "databases": DB_PATTERNS,
+    "services_aws": AWS_PATTERNS,
+    "services_gcp": GCP_PATTERNS,
+    "services_azure": AZURE_PATTERNS,
+}
+
+# Analysis results are cached per commit in .git/ under this name; bump the
+# version whenever a change to the analyzer changes its results
+ANALYSIS_CACHE_FILE = "auto-arch-cache.json"
+ANALYSIS_CACHE_VERSION = 6
+
+# Files the scripts write next to themselves (plus the rendered *.png
+# diagram); not part of the cache key
+GENERATED_FILES = ["analysis_result.json", "architecture.py", "ai_refinement_report.json"]
+
+# Where Numba keeps compiled code for the optional literal scanner
+NUMBA_CACHE_DIR = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache")) / "auto-arch-diagrams" / "numba"
+
+# Config files larger than this are re-read instead of kept in memory
+FILE_CACHE_MAX_SIZE = 1024 * 1024
+
+# Configuration files searched alongside the Python sources
+CONFIG_FILES = [
+    "requirements.txt", "pyproject.toml", "Pipfile",
+    "package.json", "yarn.lock", "package-lock.json",
+    "Dockerfile", "docker-compose.yml", ".env"
+]
+
+# Parent directory -> structural component category
+CATEGORY_DIRS = {
+    **dict.fromkeys(["controllers", "controller", "routes", "route", "views", "view",
+                     "handlers", "handler", "endpoints", "endpoint"], "controllers"),
+    **dict.fromkeys(["services", "service"], "services"),
+    **dict.fromkeys(["resolvers", "resolver"], "graphql_resolvers"),
+    **dict.fromkeys(["models", "model"], "models"),
+    **dict.fromkeys(["jobs", "job", "tasks", "task", "cron", "workers"], "cron_jobs"),
+}
+
+# File name suffix -> structural component category
+STEM_SUFFIX_CATEGORIES = {
+    "_service": "services",
+    "Service": "services",
+    "_resolver": "graphql_resolvers",
+    "_model": "models",
+    "Model": "models",
+    "_job": "cron_jobs",
+    "_task": "cron_jobs",
+}
+
+# Top-level directories and files that signal a Kubernetes deployment
+K8S_DIRS = ["k8s", "kubernetes", "manifests", "charts"]
+K8S_FILES = ["Chart.yaml", "kustomization.yaml", "kustomization.yml"]
+
+# Vendored, generated and tool directories that never contain project
+# sources. Hidden directories are skipped as well (see is_skipped_dir);
+# shared with ai_refiner.py so both scripts see the same files
+SKIP_DIRS = frozenset({
+    "node_modules", "venv", "__pycache__", "site-packages", "dist", "build", "target",
+})
+
+
+def is_skipped_dir(name: str) -> bool:
+    """Whether a directory is never analyzed: SKIP_DIRS and hidden directories (.git, .venv, ...)"""
+    return name in SKIP_DIRS or name.startswith(".")
+
+def _as_literal(pattern: str) -> Optional[bytes]:
+    """Returns the lowercased bytes a pattern matches literally, or None for a true regex"""
+    literal = re.sub(r"\\(.)", r"\1", pattern)
+    if re.escape(literal) != pattern:
+        return None
+    return literal.lower().encode("ascii")
+
+
+def split_patterns(patterns: List[str]) -> Tuple[List[bytes], List[Tuple[bytes, bytes]], List[str]]:
+    """Classifies the patterns of one technology by the cheapest check that matches them.
+    
+    Returns (literals, bridged, regexes): lowercased literals (escaped ones
+    such as \\.s3\\. included) for plain substring search, (first, second)
+    literal pairs for "first.*second" patterns (see on_same_line), and the
+    true regexes. A literal containing a shorter literal of the same list,
+    and a bridged pattern with a piece containing one, can never add a
+    match and are dropped. Shared with ai_refiner.py.
+    """
+    all_literals = {_as_literal(p) for p in patterns} - {None}
+    literals, bridged, regexes = [], [], []
+    for pattern in patterns:
+        literal = _as_literal(pattern)
+        pieces = [_as_literal(piece) for piece in pattern.split(".*")]
+        if literal is not None:
+            if literal not in literals and not any(other in literal and other != literal for other in all_literals):
+                literals.append(literal)
+        elif len(pieces) == 2 and None not in pieces:
+            # Every match contains both pieces, so a piece that is already
+            # a literal of the same list makes the pattern redundant
+            if not any(other in piece for other in all_literals for piece in pieces):
+                bridged.append(tuple(pieces))
+        else:
+            regexes.append(pattern)
+    return literals, bridged, regexes
+
+
+def _build_pattern_tables():
+    """Builds the literal, bridged and regex detection tables from PATTERN_CATEGORIES.
+    
+    Literals map lowercased bytes, and bridged patterns (first, second)
+    pairs, to the set of (component, name) targets they detect. Every true
+    regex gets its own named group; the group name maps back to its target
+    and to its source. Each table is ordered cheapest first (shortest
+    patterns, which also hit most often), so a target found early skips
+    the checks that follow it.
+    """
+    literal_targets = defaultdict(set)
+    bridged_targets = defaultdict(set)
+    pattern_targets = {}
+    pattern_sources = {}
+    for category, patterns in PATTERN_CATEGORIES.items():
+        for name, name_patterns in patterns.items():
+            literals, bridged, regexes = split_patterns(name_patterns)
+            for literal in literals:
+                literal_targets[literal].add((category, name))
+            for pieces in bridged:
+                bridged_targets[pieces].add((category, name))
+            for pattern in regexes:
+                group = f"g{len(pattern_targets)}"
+                pattern_targets[group] = (category, name)
+                pattern_sources[group] = pattern.encode("ascii")
+    
+    return (
+        dict(sorted(literal_targets.items(), key=lambda item: len(item[0]))),
+        dict(sorted(bridged_targets.items(), key=lambda item: len(b"".join(item[0])))),
+        dict(sorted(pattern_targets.items(), key=lambda item: len(pattern_sources[item[0]]))),
+        pattern_sources,
+    )
+
+
+def _build_literal_automaton(literal_targets: Dict[bytes, Set[Tuple[str, str]]]):
+    """Folds all literals into one Aho-Corasick automaton reporting their targets"""
+    automaton = ahocorasick.Automaton()
+    for literal, targets in literal_targets.items():
+        automaton.add_word(literal.decode("ascii"), targets)
+    automaton.make_automaton()
+    return automaton
+
+
+_LITERAL_TARGETS, _BRIDGED_TARGETS, _PATTERN_TARGETS, _PATTERN_SOURCES = _build_pattern_tables()
+
+# With pyahocorasick installed, all literals are found in a single pass
+_LITERAL_AUTOMATON = _build_literal_automaton(_LITERAL_TARGETS) if ahocorasick is not None else None
+
+
+def _build_literal_dfa(literals: List[bytes]):
+    """Builds an Aho-Corasick automaton over bytes as dense numpy tables.
+    
+    Failure links are folded into a full transitions[state, byte] table, and
+    the literal indexes each state reports are stored in CSR form: those of
+    state s are outputs[offsets[s]:offsets[s + 1]].
+    """
+    children = [{}]
+    matches = [set()]
+    for index, literal in enumerate(literals):
+        state = 0
+        for byte in literal:
+            if byte not in children[state]:
+                children.append({})
+                matches.append(set())
+                children[state][byte] = len(children) - 1
+            state = children[state][byte]
+        matches[state].add(index)
+    
+    transitions = np.zeros((len(children), 256), dtype=np.int32)
+    fail = [0] * len(children)
+    queue = deque(children[0].values())
+    for byte, child in children[0].items():
+        transitions[0, byte] = child
+    # Breadth-first, so the row of a state's failure target is always complete
+    while queue:
+        state = queue.popleft()
+        matches[state] |= matches[fail[state]]
+        for byte in range(256):
+            child = children[state].get(byte)
+            if child is None:
+                transitions[state, byte] = transitions[fail[state], byte]
+            else:
+                fail[child] = transitions[fail[state], byte]
+                transitions[state, byte] = child
+                queue.append(child)
+    
+    offsets = np.zeros(len(children) + 1, dtype=np.int32)
+    for state, state_matches in enumerate(matches):
+        offsets[state + 1] = offsets[state] + len(state_matches)
+    outputs = np.array([index for state_matches in matches for index in sorted(state_matches)], dtype=np.int32)
+    return transitions, offsets, outputs, len(literals)
+
+
+def _dfa_scan(content, transitions, offsets, outputs, literal_count):
+    """Returns which literals occur in a uint8 array, one flag per literal"""
+    found = np.zeros(literal_count, dtype=np.bool_)
+    state = 0
+    for byte in content:
+        state = transitions[state, byte]
+        for position in range(offsets[state], offsets[state + 1]):
+            found[outputs[position]] = True
+    return found
+
+
+def _native_literal_scan(content_lower: bytes):
+    """Runs the compiled _dfa_scan, compiling it (or loading it from cache) on first use"""
+    global _dfa_scan_native
+    content = np.frombuffer(content_lower, dtype=np.uint8)
+    try:
+        return _dfa_scan_native(content, *_LITERAL_DFA)
+    except ModuleNotFoundError:
+        # Code cached while this file ran under another module name cannot
+        # be loaded; compile a private copy instead
+        _dfa_scan_native = njit(nogil=True)(_dfa_scan)
+        return _dfa_scan_native(content, *_LITERAL_DFA)
+
+
+# Without pyahocorasick, Numba compiles the same single-pass match to native
+# code; nogil lets the scan threads run it in parallel. Compiled code is
+# cached under the user cache directory rather than next to this script
+_LITERAL_DFA = None
+if _LITERAL_AUTOMATON is None:
+    try:
+        import numpy as np
+        from numba import njit
+        from numba.core import config as numba_config
+    except ImportError:
+        np = njit = None
+    else:
+        _LITERAL_DFA = _build_literal_dfa(list(_LITERAL_TARGETS))
+        _LITERAL_TARGET_LIST = list(_LITERAL_TARGETS.values())
+        # The cache location is fixed when the dispatcher is created, so the
+        # setting is only overridden (unless the user configured one) for
+        # that moment instead of for every Numba user in the process
+        user_cache_dir = numba_config.CACHE_DIR
+        if not user_cache_dir:
+            numba_config.CACHE_DIR = str(NUMBA_CACHE_DIR)
+        try:
+            _dfa_scan_native = njit(cache=True, nogil=True)(_dfa_scan)
+        finally:
+            numba_config.CACHE_DIR = user_cache_dir
+
+
+@lru_cache(maxsize=None)
+def _combined_regex(groups: Tuple[str, ...]) -> re.Pattern:
+    """Compiles the given pattern groups into one case-insensitive alternation.
+    
+    Only a handful of group subsets ever occur, so each one is compiled once
+    per process instead of being rebuilt for every file.
+    """
+    return re.compile(
+        b"|".join(b"(?P<%s>%s)" % (group.encode("ascii"), _PATTERN_SOURCES[group]) for group in groups),
+        re.IGNORECASE,
+    )
+
+
+def on_same_line(content: bytes, first: bytes, second: bytes) -> bool:
+    """Whether first is followed by second on one line (the regex first.*second).
+    
+    Shared with ai_refiner.py.
+    """
+    start = content.find(first)
+    while start != -1:
+        end = start + len(first)
+        found = content.find(second, end)
+        if found == -1:
+            return False
+        newline = content.find(b"\n", end, found)
+        if newline == -1:
+            return True
+        # Any other occurrence of first before that newline sees the same second
+        start = content.find(first, newline + 1)
+    return False
+
+
+def _scan_content(content: bytes, known_hits: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Returns the (component, name) targets whose patterns match in a buffer.
+    
+    Literal and bridged patterns are looked up in the lowercased contents
+    first. The remaining regexes are matched as one alternation of the patterns whose
+    target is still unknown; a match can hide an overlapping match of
+    another pattern, so the buffer is rescanned with the remaining patterns
+    until a pass finds nothing new.
+    """
+    hits = set()
+    literals = [
+        (literal, targets) for literal, targets in _LITERAL_TARGETS.items()
+        if not targets <= known_hits
+    ]
+    bridged = [
+        (pieces, targets) for pieces, targets in _BRIDGED_TARGETS.items()
+        if not targets <= known_hits
+    ]
+    if literals or bridged:
+        content_lower = content.lower()
+    if literals:
+        if _LITERAL_AUTOMATON is not None:
+            for _, targets in _LITERAL_AUTOMATON.iter(content_lower.decode("latin-1")):
+                hits |= targets
+        elif _LITERAL_DFA is not None:
+            found = _native_literal_scan(content_lower)
+            for index in np.flatnonzero(found):
+                hits |= _LITERAL_TARGET_LIST[index]
+        else:
+            for literal, targets in literals:
+                if not targets <= hits and literal in content_lower:
+                    hits |= targets
+    for (first, second), targets in bridged:
+        if not targets <= hits and on_same_line(content_lower, first, second):
+            hits |= targets
+    
+    pending = [
+        group for group, target in _PATTERN_TARGETS.items()
+        if target not in known_hits and target not in hits
+    ]
+    while pending:
+        found = {
+            _PATTERN_TARGETS[match.lastgroup]
+            for match in _combined_regex(tuple(pending)).finditer(content)
+        }
+        if not found:
+            break
+        hits |= found
+        pending = [group for group in pending if _PATTERN_TARGETS[group] not in hits]
+    return hits
+
+
+def _scan_file(file_path: str, known_hits: Set[Tuple[str, str]]) -> Set[Tuple[str, str]]:
+    """Scans a file for the targets not already in known_hits (see _scan_content)"""
+    # Case-insensitive literal matching needs a lowercased copy of the whole
+    # file anyway, so a plain read is as cheap as any memory mapping
+    try:
+        with open(file_path, "rb") as f:
+            return _scan_content(f.read(), known_hits)
+    except OSError:
+        return set()
+
+
+def _iter_files(root: Path):
+    """Yields the path of every file under root.
+    
+    Uses os.scandir so file types come from the directory entries instead
+    of a stat() per file, and never descends into skipped directories.
+    """
+    stack = [str(root)]
+    while stack:
+        directory = stack.pop()
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not is_skipped_dir(entry.name):
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        yield entry.path
+        except OSError:
+            continue
+
 
 class RepositoryAnalyzer:
     def __init__(self, repo_root: str = None):
@@ -39,6 +466,13 @@ class RepositoryAnalyzer:
             self.repo_root,  # Root level files
         ]
         
+        # Drop paths nested in another source path, which would be walked twice
+        resolved = {path: path.resolve() for path in self.source_paths}
+        self.source_paths = [
+            path for path in self.source_paths
+            if not any(other in resolved[path].parents for other in resolved.values())
+        ]
+        
         self.components = {
             "databases": set(),
             "services_aws": set(),
@@ -53,11 +487,27 @@ class RepositoryAnalyzer:
             "message_queues": set(),
             "cache": set(),
         }
+        
+        # (component, name) pairs found by _scan_all_patterns
+        self._hits = set()
+        
+        # Repository file list and config file contents shared by every analyzer
+        self._all_files = None
+        self._file_cache = {}
     
     def analyze(self) -> Dict:
         """Analyzes the complete repository"""
         print("🔍 Starting repository analysis...")
         
+        # An unchanged commit gives the same results as the last run
+        cache_key = self._analysis_cache_key()
+        if cache_key is not None and self._load_analysis_cache(cache_key):
+            print("✅ Analysis loaded from cache (commit unchanged)")
+            return self.components
+        
+        # Scan every file once for all technology patterns
+        self._scan_all_patterns()
+        
         # Analyze databases
         self._analyze_databases()
         
@@ -73,162 +523,153 @@ class RepositoryAnalyzer:
         # Analyze Docker and deployment
         self._analyze_deployment()
         
+        if cache_key is not None:
+            self._save_analysis_cache(cache_key)
+        
         print("✅ Analysis completed")
         return self.components
     
+    def _analysis_cache_key(self):
+        """Returns the cache key for the current checkout, or None when results cannot be cached.
+        
+        The key is the HEAD commit SHA plus the name, size and mtime of every
+        untracked, non-ignored file, since those are analyzed too, and of the
+        root config files and deployment markers, which are checked even when
+        ignored (e.g. .env). Modified tracked files make the checkout differ
+        from HEAD, so they disable the cache. The scripts' own output
+        (GENERATED_FILES and the rendered diagram) is left out of the key, or
+        every run would invalidate the next one.
+        """
+        if not (self.repo_root / ".git").is_dir():
+            return None
+        try:
+            head = subprocess.run(
+                ["git", "-C", str(self.repo_root), "rev-parse", "HEAD"],
+                capture_output=True, check=True,
+            ).stdout.strip()
+            status = subprocess.run(
+                ["git", "-C", str(self.repo_root), "status", "--porcelain", "--untracked-files=no"],
+                capture_output=True, check=True,
+            ).stdout
+            untracked = subprocess.run(
+                ["git", "-C", str(self.repo_root), "ls-files", "-z", "--others", "--exclude-standard"],
+                capture_output=True, check=True,
+            ).stdout
+        except (OSError, subprocess.CalledProcessError):
+            return None
+        if status:
+            return None
+        
+        scripts_dir = os.path.realpath(Path(__file__).parent)
+        generated = {os.path.join(scripts_dir, name) for name in GENERATED_FILES}
+        key = hashlib.sha1(head)
+        for path in sorted(untracked.split(b"\0")):
+            if not path:
+                continue
+            file_path = os.path.realpath(self.repo_root / os.fsdecode(path))
+            if file_path in generated or (
+                    file_path.endswith(".png") and os.path.dirname(file_path) == scripts_dir):
+                continue
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            key.update(b"\0%s:%d:%d" % (path, stat.st_size, stat.st_mtime_ns))
+        
+        # Read by _analyze_config_files / _analyze_deployment whether or not
+        # git ignores them; a missing marker is part of the key as well
+        for name in dict.fromkeys(CONFIG_FILES + K8S_DIRS + K8S_FILES):
+            try:
+                stat = (self.repo_root / name).stat()
+            except OSError:
+                key.update(b"\0%s:-" % os.fsencode(name))
+                continue
+            key.update(b"\0%s:%d:%d" % (os.fsencode(name), stat.st_size, stat.st_mtime_ns))
+        return key.hexdigest()
+    
+    def _load_analysis_cache(self, cache_key: str) -> bool:
+        """Restores the components cached for cache_key, if any"""
+        try:
+            with open(self.repo_root / ".git" / ANALYSIS_CACHE_FILE, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            if cache.get("version") != ANALYSIS_CACHE_VERSION or cache_key not in cache.get("commits", {}):
+                return False
+        except (OSError, ValueError, AttributeError):
+            return False
+        
+        for key, value in cache["commits"][cache_key].items():
+            self.components[key] = set(value) if isinstance(self.components.get(key), set) else value
+        return True
+    
+    def _save_analysis_cache(self, cache_key: str):
+        """Stores the components for cache_key, replacing any older commit"""
+        cache_file = self.repo_root / ".git" / ANALYSIS_CACHE_FILE
+        tmp_file = None
+        try:
+            # A unique temporary name keeps concurrent runs from clobbering
+            # each other's half-written file; the last replace wins
+            with tempfile.NamedTemporaryFile(
+                "w", encoding="utf-8", dir=cache_file.parent,
+                prefix=cache_file.name, suffix=".tmp", delete=False,
+            ) as f:
+                tmp_file = f.name
+                json.dump({
+                    "version": ANALYSIS_CACHE_VERSION,
+                    "commits": {
+                        cache_key: {k: sorted(v) if isinstance(v, set) else v for k, v in self.components.items()}
+                    },
+                }, f)
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            print(f"⚠️ Could not save analysis cache: {e}")
+            if tmp_file is not None:
+                try:
+                    os.remove(tmp_file)
+                except OSError:
+                    pass
+    
     def _analyze_databases(self):
         """Detects databases used in the project"""
-        db_patterns = {
-            "PostgreSQL": [
-                r"psycopg2", r"asyncpg", r"postgresql://", 
-                r"postgres://", r"PostgreSQL", r"POSTGRES"
-            ],
-            "MySQL": [
-                r"mysql", r"pymysql", r"mysql://", r"MySQL", r"MYSQL"
-            ],
-            "MongoDB": [
-                r"pymongo", r"MongoClient", r"mongodb://", 
-                r"MongoDB", r"mongo"
-            ],
-            "SQLite": [
-                r"sqlite3", r"sqlite://", r"\.db$", r"\.sqlite$"
-            ],
-            "Redis": [
-                r"redis", r"Redis", r"redis://", r"REDIS"
-            ],
-            "DynamoDB": [
-                r"dynamodb", r"DynamoDB", r"boto3.*dynamodb"
-            ],
-        }
-        
-        for db_name, patterns in db_patterns.items():
-            for pattern in patterns:
-                if self._search_in_files(pattern):
-                    self.components["databases"].add(db_name)
-                    break
+        for db_name in DB_PATTERNS:
+            if ("databases", db_name) in self._hits:
+                self.components["databases"].add(db_name)
     
     def _analyze_cloud_services(self):
         """Detects cloud services used"""
-        # AWS Services
-        aws_patterns = {
-            "S3": [r"boto3.*s3", r"s3_client", r"S3", r"\.s3\.", r"aws.*s3"],
-            "Lambda": [r"lambda", r"Lambda", r"aws.*lambda"],
-            "SNS": [r"sns", r"SNS", r"aws.*sns"],
-            "SQS": [r"sqs", r"SQS", r"aws.*sqs"],
-            "RDS": [r"rds", r"RDS", r"aws.*rds"],
-            "DynamoDB": [r"dynamodb", r"DynamoDB", r"aws.*dynamodb"],
-            "CloudWatch": [r"cloudwatch", r"CloudWatch"],
-            "API Gateway": [r"apigateway", r"API.*Gateway"],
-        }
-        
-        for service_name, patterns in aws_patterns.items():
-            for pattern in patterns:
-                if self._search_in_files(pattern):
-                    self.components["services_aws"].add(service_name)
-                    break
-        
-        # GCP Services
-        gcp_patterns = {
-            "Cloud Storage": [r"google.*storage", r"gcs", r"Cloud.*Storage"],
-            "BigQuery": [r"bigquery", r"BigQuery"],
-            "Pub/Sub": [r"pubsub", r"Pub.*Sub"],
-            "Cloud Functions": [r"cloud.*functions", r"gcp.*functions"],
-        }
-        
-        for service_name, patterns in gcp_patterns.items():
-            for pattern in patterns:
-                if self._search_in_files(pattern):
-                    self.components["services_gcp"].add(service_name)
-                    break
-        
-        # Azure Services
-        azure_patterns = {
-            "Blob Storage": [r"azure.*blob", r"BlobService"],
-            "Service Bus": [r"azure.*servicebus", r"ServiceBus"],
-            "Functions": [r"azure.*functions", r"AzureFunctions"],
-        }
-        
-        for service_name, patterns in azure_patterns.items():
-            for pattern in patterns:
-                if self._search_in_files(pattern):
-                    self.components["services_azure"].add(service_name)
-                    break
+        for category in ["services_aws", "services_gcp", "services_azure"]:
+            for service_name in PATTERN_CATEGORIES[category]:
+                if (category, service_name) in self._hits:
+                    self.components[category].add(service_name)
     
     def _analyze_application_structure(self):
         """Analyzes application structure"""
         for source_path in self.source_paths:
             if not source_path.exists():
                 continue
-                
-            # Controllers/Routes
-            controller_patterns = [
-                "**/controllers/*.py", "**/controller/*.py",
-                "**/routes/*.py", "**/route/*.py", 
-                "**/views/*.py", "**/view/*.py",
-                "**/handlers/*.py", "**/handler/*.py",
-                "**/endpoints/*.py", "**/endpoint/*.py"
-            ]
-            
-            controllers = []
-            for pattern in controller_patterns:
-                for file in source_path.glob(pattern):
-                    if file.stem != "__init__":
-                        controllers.append(file.stem)
-            self.components["controllers"].extend(controllers)
-            
-            # Services
-            service_patterns = [
-                "**/services/*.py", "**/service/*.py",
-                "**/*_service.py", "**/*Service.py"
-            ]
-            
-            services = []
-            for pattern in service_patterns:
-                for file in source_path.glob(pattern):
-                    if file.stem != "__init__" and "service" in file.stem.lower():
-                        services.append(file.stem)
-            self.components["services"].extend(services)
-            
-            # GraphQL Resolvers
-            resolver_patterns = [
-                "**/resolvers/*.py", "**/resolver/*.py",
-                "**/graphql/**/*.py", "**/*_resolver.py"
-            ]
-            
-            resolvers = []
-            for pattern in resolver_patterns:
-                for file in source_path.glob(pattern):
-                    if file.stem != "__init__":
-                        resolvers.append(file.stem)
-            self.components["graphql_resolvers"].extend(resolvers)
             
-            # Models
-            model_patterns = [
-                "**/models/*.py", "**/model/*.py",
-                "**/*_model.py", "**/*Model.py"
-            ]
-            
-            models = []
-            for pattern in model_patterns:
-                for file in source_path.glob(pattern):
-                    if file.stem != "__init__":
-                        models.append(file.stem)
-            self.components["models"].extend(models)
-            
-            # Background Jobs/Cron
-            job_patterns = [
-                "**/jobs/*.py", "**/job/*.py",
-                "**/tasks/*.py", "**/task/*.py",
-                "**/cron/*.py", "**/workers/*.py",
-                "**/*_job.py", "**/*_task.py"
-            ]
-            
-            jobs = []
-            for pattern in job_patterns:
-                for file in source_path.glob(pattern):
-                    if file.stem != "__init__":
-                        jobs.append(file.stem)
-            self.components["cron_jobs"].extend(jobs)
+            # Classify each file once by its parent directory and name
+            for path in self._source_files(source_path):
+                if not path.endswith(".py"):
+                    continue
+                
+                *directories, file_name = path.split("/")
+                stem = os.path.splitext(file_name)[0]
+                if stem == "__init__":
+                    continue
+                
+                categories = {
+                    category for suffix, category in STEM_SUFFIX_CATEGORIES.items()
+                    if stem.endswith(suffix)
+                }
+                if directories and directories[-1] in CATEGORY_DIRS:
+                    categories.add(CATEGORY_DIRS[directories[-1]])
+                if "graphql" in directories:
+                    categories.add("graphql_resolvers")
+                if "service" not in stem.lower():
+                    categories.discard("services")
+                
+                for category in categories:
+                    self.components[category].append(stem)
         
         # Remove duplicates and sort
         for key in ["controllers", "services", "graphql_resolvers", "models", "cron_jobs"]:
@@ -245,44 +686,48 @@ class RepositoryAnalyzer:
         
         for req_file in req_files:
             if req_file.exists():
-                content = req_file.read_text().lower()
+                content = None
+                if req_file.name == "pyproject.toml":
+                    content = self._pyproject_dependencies(req_file)
+                if content is None:
+                    content = self._read_file(req_file).lower()
                 
                 # Web frameworks
-                if any(fw in content for fw in ["fastapi", "fast-api"]):
+                if any(fw in content for fw in [b"fastapi", b"fast-api"]):
                     self.components["framework"] = "FastAPI"
-                elif "django" in content:
+                elif b"django" in content:
                     self.components["framework"] = "Django"
-                elif "flask" in content:
+                elif b"flask" in content:
                     self.components["framework"] = "Flask"
-                elif "starlette" in content:
+                elif b"starlette" in content:
                     self.components["framework"] = "Starlette"
                 
                 # GraphQL
-                if "strawberry" in content:
+                if b"strawberry" in content:
                     self.components["graphql"] = "Strawberry"
-                elif "graphene" in content:
+                elif b"graphene" in content:
                     self.components["graphql"] = "Graphene"
-                elif "ariadne" in content:
+                elif b"ariadne" in content:
                     self.components["graphql"] = "Ariadne"
                 
                 # Servers
-                if "uvicorn" in content:
+                if b"uvicorn" in content:
                     self.components["server"] = "Uvicorn"
-                elif "gunicorn" in content:
+                elif b"gunicorn" in content:
                     self.components["server"] = "Gunicorn"
                 
                 # Schedulers
-                if "apscheduler" in content:
+                if b"apscheduler" in content:
                     self.components["scheduler"] = "APScheduler"
-                elif "celery" in content:
+                elif b"celery" in content:
                     self.components["scheduler"] = "Celery"
                 
                 # ORM
-                if "sqlalchemy" in content:
+                if b"sqlalchemy" in content:
                     self.components["orm"] = "SQLAlchemy"
-                elif "django" in content:
+                elif b"django" in content:
                     self.components["orm"] = "Django ORM"
-                elif "peewee" in content:
+                elif b"peewee" in content:
                     self.components["orm"] = "Peewee"
         
         # Node.js package.json
@@ -290,7 +735,7 @@ class RepositoryAnalyzer:
         if package_json.exists():
             try:
                 import json as json_lib
-                content = json_lib.loads(package_json.read_text())
+                content = json_lib.loads(self._read_file(package_json))
                 dependencies = {**content.get("dependencies", {}), **content.get("devDependencies", {})}
                 
                 # Node.js frameworks
@@ -308,6 +753,48 @@ class RepositoryAnalyzer:
             except:
                 pass
     
+    def _pyproject_dependencies(self, pyproject: Path) -> Optional[bytes]:
+        """Returns the lowercased dependency specs declared in pyproject.toml.
+        
+        Matching only the declared dependencies avoids hits on comments and
+        unrelated settings. Returns None when the file cannot be parsed (or
+        tomllib is unavailable), declares its dependencies as dynamic or has
+        no dependency table this knows, so callers fall back to the whole file.
+        """
+        if tomllib is None:
+            return None
+        try:
+            data = tomllib.loads(self._read_file(pyproject).decode("utf-8"))
+            
+            project = data.get("project", {})
+            tool = data.get("tool", {})
+            poetry = tool.get("poetry", {})
+            tables = [
+                project.get("dependencies"),
+                *project.get("optional-dependencies", {}).values(),
+                # PEP 735 dependency groups
+                *data.get("dependency-groups", {}).values(),
+                tool.get("uv", {}).get("dev-dependencies"),
+                *tool.get("pdm", {}).get("dev-dependencies", {}).values(),
+                poetry.get("dependencies"),
+                poetry.get("dev-dependencies"),
+                *(group.get("dependencies") for group in poetry.get("group", {}).values()),
+            ]
+            tables = [table for table in tables if table is not None]
+            if not tables or "dependencies" in project.get("dynamic", []):
+                return None
+            
+            # Poetry tables are keyed by package name, so iterating yields the
+            # names; dependency-group include entries are tables and skipped
+            dependencies = [
+                dependency for table in tables for dependency in table
+                if isinstance(dependency, str)
+            ]
+        except (ValueError, AttributeError, TypeError):
+            return None
+        
+        return "\n".join(dependencies).lower().encode("utf-8")
+    
     def _analyze_deployment(self):
         """Analyzes deployment configuration"""
         # Docker
@@ -317,52 +804,104 @@ class RepositoryAnalyzer:
         if (self.repo_root / "docker-compose.yml").exists():
             self.components["orchestration"] = "Docker Compose"
         
-        # Kubernetes
-        k8s_files = list(self.repo_root.glob("**/*.yaml")) + list(self.repo_root.glob("**/*.yml"))
-        for file in k8s_files:
+        # Kubernetes: detected from conventional names, without reading manifests
+        if (any((self.repo_root / d).is_dir() for d in K8S_DIRS)
+                or any((self.repo_root / f).exists() for f in K8S_FILES)):
+            self.components["orchestration"] = "Kubernetes"
+    
+    def _read_file(self, file_path: Path) -> bytes:
+        """Returns a file's contents, keeping files up to FILE_CACHE_MAX_SIZE in memory"""
+        key = str(file_path)
+        if key in self._file_cache:
+            return self._file_cache[key]
+        
+        content = file_path.read_bytes()
+        if len(content) <= FILE_CACHE_MAX_SIZE:
+            self._file_cache[key] = content
+        return content
+    
+    def _list_repo_files(self) -> List[str]:
+        """Lists every repository file as a POSIX path relative to repo_root.
+        
+        In a git checkout the list comes straight from the index with
+        `git ls-files`, which also leaves out ignored files; otherwise the
+        tree is walked. The result is cached for all analyzers.
+        """
+        if self._all_files is not None:
+            return self._all_files
+        
+        files = None
+        if (self.repo_root / ".git").exists():
             try:
-                content = file.read_text()
-                if "apiVersion:" in content and "kind:" in content:
-                    self.components["orchestration"] = "Kubernetes"
-                    break
-            except:
-                continue
+                result = subprocess.run(
+                    ["git", "-C", str(self.repo_root), "ls-files", "-z", "--cached", "--others", "--exclude-standard"],
+                    capture_output=True, check=True,
+                )
+                # The index still lists tracked files deleted from the work tree
+                deleted = subprocess.run(
+                    ["git", "-C", str(self.repo_root), "ls-files", "-z", "--deleted"],
+                    capture_output=True, check=True,
+                )
+                deleted_paths = set(deleted.stdout.split(b"\0"))
+                files = [
+                    os.fsdecode(path) for path in result.stdout.split(b"\0")
+                    if path and path not in deleted_paths
+                ]
+            except (OSError, subprocess.CalledProcessError):
+                files = None
+        
+        if files is None:
+            files = [
+                Path(os.path.relpath(path, self.repo_root)).as_posix()
+                for path in _iter_files(self.repo_root)
+            ]
+        
+        # ls-files repeats unmerged paths; tracked files may still live in
+        # skipped directories
+        self._all_files = [
+            path for path in dict.fromkeys(files)
+            if not any(is_skipped_dir(directory) for directory in path.split("/")[:-1])
+        ]
+        return self._all_files
     
-    def _search_in_files(self, pattern: str) -> bool:
-        """Searches for a pattern in all relevant files"""
-        pattern_re = re.compile(pattern, re.IGNORECASE)
+    def _source_files(self, source_path: Path) -> List[str]:
+        """Returns the repository files under source_path, relative to it"""
+        if source_path == self.repo_root:
+            return self._list_repo_files()
+        prefix = source_path.relative_to(self.repo_root).as_posix() + "/"
+        return [path[len(prefix):] for path in self._list_repo_files() if path.startswith(prefix)]
+    
+    def _scan_all_patterns(self):
+        """Searches all relevant files for every technology pattern in one pass"""
+        files = {}
         
-        # Search in Python files
+        # Python files
         for source_path in self.source_paths:
             if not source_path.exists():
                 continue
-                
-            for py_file in source_path.rglob("*.py"):
-                try:
-                    content = py_file.read_text(encoding='utf-8')
-                    if pattern_re.search(content):
-                        return True
-                except:
-                    continue
+            for path in self._source_files(source_path):
+                if path.endswith(".py"):
+                    files[str(source_path / path)] = None
         
-        # Search in config files
-        config_files = [
-            "requirements.txt", "pyproject.toml", "Pipfile",
-            "package.json", "yarn.lock", "package-lock.json",
-            "Dockerfile", "docker-compose.yml", ".env"
-        ]
+        # Reads release the GIL, so a thread pool overlaps the file I/O;
+        # workers skip targets another file has already produced. Workers
+        # only ever see frozen snapshots: the main thread publishes a new
+        # one instead of growing a set they might be iterating
+        known_hits = frozenset()
+        with ThreadPoolExecutor() as executor:
+            for found in executor.map(lambda file_path: _scan_file(file_path, known_hits), files):
+                if not found <= known_hits:
+                    known_hits = known_hits | found
+        self._hits = set(known_hits)
         
-        for config_file in config_files:
+        # Config files are kept in memory for _analyze_config_files
+        for config_file in CONFIG_FILES:
             file_path = self.repo_root / config_file
-            if file_path.exists():
+            if file_path.is_file():
                 try:
-                    content = file_path.read_text(encoding='utf-8')
-                    if pattern_re.search(content):
-                        return True
-                except:
+                    self._hits |= _scan_content(self._read_file(file_path), self._hits)
+                except OSError:
                     continue
-        
-        return False
     
     def get_summary(self) -> Dict:
         """Returns analysis summary"""
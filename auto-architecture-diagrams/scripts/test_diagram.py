@@ -3,6 +3,8 @@
 """
 Test script to verify diagram generation works correctly
 """
+import os
+import runpy
 import sys
 from pathlib import Path
 
@@ -32,7 +34,8 @@ def test_diagram_generation():
     # Execute the script
     try:
         print("📊 Executing architecture.py...")
-        exec(open(script_path).read())
+        # Run in its own namespace, as if invoked from the command line
+        runpy.run_path(str(script_path), run_name="__main__")
         print("✅ Script executed without errors")
     except Exception as e:
         print(f"❌ ERROR executing script: {e}")
@@ -41,10 +44,11 @@ def test_diagram_generation():
         return False
     
     # Verify PNG was generated
-    png_files = list(script_path.parent.glob("*.png"))
+    with os.scandir(script_path.parent) as entries:
+        png_files = [entry for entry in entries if entry.name.endswith(".png") and entry.is_file()]
     if png_files:
         png_file = png_files[0]
-        print(f"✅ ✅ ✅ DIAGRAM GENERATED: {png_file}")
+        print(f"✅ ✅ ✅ DIAGRAM GENERATED: {png_file.path}")
         print(f"   Size: {png_file.stat().st_size} bytes")
         return True
     else:
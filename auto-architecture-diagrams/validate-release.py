@@ -6,52 +6,86 @@ Validation script to ensure everything is ready for public release
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor
 import subprocess
 import json
 
-def check_file_exists(file_path: str, description: str) -> bool:
+def list_directories(file_paths: list) -> dict:
+    """Map the parent directory of each path to its entry names, with one scandir per directory"""
+    directory_entries = {}
+    for directory in {os.path.dirname(file_path) for file_path in file_paths}:
+        try:
+            with os.scandir(directory or ".") as entries:
+                directory_entries[directory] = {entry.name for entry in entries}
+        except OSError:
+            directory_entries[directory] = set()
+    return directory_entries
+
+def file_exists(file_path: str, directory_entries: dict) -> bool:
+    """Check a path against the listing from list_directories"""
+    return os.path.basename(file_path) in directory_entries[os.path.dirname(file_path)]
+
+def check_file_exists(file_path: str, description: str, directory_entries: dict, log=print) -> bool:
     """Check if a file exists"""
-    if Path(file_path).exists():
-        print(f"✅ {description}: {file_path}")
+    if file_exists(file_path, directory_entries):
+        log(f"✅ {description}: {file_path}")
         return True
     else:
-        print(f"❌ MISSING {description}: {file_path}")
+        log(f"❌ MISSING {description}: {file_path}")
         return False
 
-def check_python_syntax(file_path: str) -> bool:
+def check_python_syntax(file_path: str, log=print) -> bool:
     """Check Python file syntax"""
     try:
-        subprocess.run([sys.executable, "-m", "py_compile", file_path], 
-                      check=True, capture_output=True)
-        print(f"✅ Python syntax OK: {file_path}")
+        # Compile in-process instead of spawning an interpreter per file
+        compile(Path(file_path).read_bytes(), file_path, "exec")
+        log(f"✅ Python syntax OK: {file_path}")
         return True
-    except subprocess.CalledProcessError as e:
-        print(f"❌ Python syntax ERROR in {file_path}: {e}")
+    except (SyntaxError, ValueError, OSError) as e:
+        log(f"❌ Python syntax ERROR in {file_path}: {e}")
         return False
 
-def check_yaml_syntax(file_path: str) -> bool:
+def check_yaml_syntax(file_path: str, log=print) -> bool:
     """Check YAML file syntax"""
     try:
         import yaml
         with open(file_path, 'r', encoding='utf-8') as f:
             yaml.safe_load(f)
-        print(f"✅ YAML syntax OK: {file_path}")
+        log(f"✅ YAML syntax OK: {file_path}")
         return True
     except Exception as e:
-        print(f"❌ YAML syntax ERROR in {file_path}: {e}")
+        log(f"❌ YAML syntax ERROR in {file_path}: {e}")
         return False
 
-def check_json_syntax(file_path: str) -> bool:
+def check_json_syntax(file_path: str, log=print) -> bool:
     """Check JSON file syntax"""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
+        # Binary mode lets the parser decode UTF-8 itself
+        with open(file_path, 'rb') as f:
             json.load(f)
-        print(f"✅ JSON syntax OK: {file_path}")
+        log(f"✅ JSON syntax OK: {file_path}")
         return True
     except Exception as e:
-        print(f"❌ JSON syntax ERROR in {file_path}: {e}")
+        log(f"❌ JSON syntax ERROR in {file_path}: {e}")
         return False
 
+def run_check(check: tuple) -> tuple:
+    """Run a (function, *args) check, collecting its output instead of printing it"""
+    func, *args = check
+    messages = []
+    ok = func(*args, log=messages.append)
+    return ok, messages
+
+def report_checks(results) -> int:
+    """Print check results in submission order and return the number of failures"""
+    errors = 0
+    for ok, messages in results:
+        for message in messages:
+            print(message)
+        if not ok:
+            errors += 1
+    return errors
+
 def main():
     """Main validation function"""
     print("🔍 Validating Auto Architecture Diagrams for public release...\n")
@@ -78,12 +112,6 @@ def main():
         ("config/diagram-config.json", "Configuration example"),
     ]
     
-    print("📁 Checking required files...")
-    for file_path, description in required_files:
-        if not check_file_exists(file_path, description):
-            errors += 1
-    
-    print("\n🐍 Checking Python syntax...")
     python_files = [
         "scripts/analyze_repo.py",
         "scripts/ai_refiner.py", 
@@ -93,32 +121,52 @@ def main():
         "validate-release.py"
     ]
     
-    for file_path in python_files:
-        if Path(file_path).exists():
-            if not check_python_syntax(file_path):
-                errors += 1
-    
-    print("\n📄 Checking YAML syntax...")
     yaml_files = [
         "workflows/generate-diagram.yml",
         "workflows/generate-diagram-auto.yml",
         ".github/workflows/test-scripts.yml"
     ]
     
-    for file_path in yaml_files:
-        if Path(file_path).exists():
-            if not check_yaml_syntax(file_path):
-                errors += 1
-    
-    print("\n🔧 Checking JSON syntax...")
     json_files = [
         "config/diagram-config.json"
     ]
     
-    for file_path in json_files:
-        if Path(file_path).exists():
-            if not check_json_syntax(file_path):
-                errors += 1
+    # List every involved directory once instead of stat()ing each file
+    directory_entries = list_directories(
+        [file_path for file_path, _ in required_files] + python_files + yaml_files + json_files
+    )
+    
+    # The checks are independent, so they all run concurrently; output is
+    # still printed section by section, in order
+    with ThreadPoolExecutor() as executor:
+        file_results = executor.map(run_check, [
+            (check_file_exists, file_path, description, directory_entries)
+            for file_path, description in required_files
+        ])
+        python_results = executor.map(run_check, [
+            (check_python_syntax, file_path)
+            for file_path in python_files if file_exists(file_path, directory_entries)
+        ])
+        yaml_results = executor.map(run_check, [
+            (check_yaml_syntax, file_path)
+            for file_path in yaml_files if file_exists(file_path, directory_entries)
+        ])
+        json_results = executor.map(run_check, [
+            (check_json_syntax, file_path)
+            for file_path in json_files if file_exists(file_path, directory_entries)
+        ])
+        
+        print("📁 Checking required files...")
+        errors += report_checks(file_results)
+        
+        print("\n🐍 Checking Python syntax...")
+        errors += report_checks(python_results)
+        
+        print("\n📄 Checking YAML syntax...")
+        errors += report_checks(yaml_results)
+        
+        print("\n🔧 Checking JSON syntax...")
+        errors += report_checks(json_results)
     
     print("\n📊 Checking documentation completeness...")
     